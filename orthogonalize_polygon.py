@@ -3,48 +3,61 @@
     Author: Martin Machyna
     Email: machyna@gmail.com
     Date created: 9/28/2020
-    Date last modified: 9/30/2020
-    Version: 1.0.4
+    Date last modified: 10/15/2026
+    Version: 1.1.0
     License: GPLv3
-    credits: Jérôme Renard [calculate_initial_compass_bearing(): https://gist.github.com/jeromer/2005586] 
+    credits: Jérôme Renard [compass_bearing(): https://gist.github.com/jeromer/2005586] 
              JOSM project  [general idea: https://github.com/openstreetmap/josm/blob/6890fb0715ab22734b72be86537e33d5c4021c5d/src/org/openstreetmap/josm/actions/OrthogonalizeAction.java#L334]
-    Python Version: Python 3.8.5 
-    Modules: geopandas==0.8.2
-             pandas==1.2.1
-             Shapely==1.7.1
-             Fiona==1.8.18
-             numpy==1.19.5
-             pyproj==3.0.0.post1
+    Python Version: Python 3.11.7 
+    Modules: geopandas==1.2.0
+             pandas==3.0.6
+             Shapely==2.2.0
+             pyogrio==0.13.0
+             numpy==2.4.6
+             pyproj==3.7.2
+             numba==0.68.0 (optional)
     Changelog: 1.0.1 - Added constraint that in order to make the next segment continue in the same direction as the previous segment, it can not deviate from that direction more than +/- 20 degrees.
                1.0.2 - Fix cases when building is at ~45˚ angle to cardinal directions
                      - Added improvement when 180˚ turns are present the builing shape
                1.0.3 - Leave sides of polygon that are meant to be skewed untouched
                1.0.4 - Add orthogonalization for inner polygon rings (holes)
+               1.1.0 - Rotate polygons in local tangent plane instead of reprojecting to Mercator
+                     - Rotate back around the same origin so untouched points keep their position
+                     - Process all buildings at once with Shapely 2.0 array functions
+                     - Orthogonalize rings in parallel with Numba when it is installed
+                     - Segments deviating more than maxAngleChange from the previous segment direction turn to the adjacent direction,
+                       or to the opposite direction when deviating more than 135˚ (previously depended on order of range checks)
 '''
 
 import geopandas as gpd
 import pandas as pd
 import shapely
-from shapely import speedups
-from shapely.geometry import Polygon
-from shapely.geometry import MultiPolygon
+import numpy as np
 import math
-import statistics
-speedups.enable()
 
-def calculate_initial_compass_bearing(pointA, pointB):
+try:
+    from numba import njit, prange
+except ImportError:
+    # Numba is optional, without it the numeric functions run as plain Python
+    prange = range
+
+    def njit(**kwargs):
+        return lambda func: func
+
+def compass_bearing(lat1, lon1, lat2, lon2):
     """
-    Calculates the bearing between two points.
+    Calculates the bearing between two points given by their coordinates.
 
     The formulae used is the following:
         θ = atan2(sin(Δlong).cos(lat2),
                   cos(lat1).sin(lat2) − sin(lat1).cos(lat2).cos(Δlong))
 
+    Polygon segments use the planar approximation in calculate_segment_angles
+    instead, this great-circle version is kept for external callers.
+
     :Parameters:
-      - `pointA: The tuple representing the latitude/longitude for the
-        first point. Latitude and longitude must be in decimal degrees
-      - `pointB: The tuple representing the latitude/longitude for the
-        second point. Latitude and longitude must be in decimal degrees
+      - `lat1, lon1: latitude/longitude of the first point in decimal degrees
+      - `lat2, lon2: latitude/longitude of the second point in decimal degrees
 
     :Returns:
       The bearing in degrees
@@ -52,13 +65,9 @@ def calculate_initial_compass_bearing(pointA, pointB):
     :Returns Type:
       float
     """
-    if (type(pointA) != tuple) or (type(pointB) != tuple):
-        raise TypeError("Only tuples are supported as arguments")
-
-    lat1 = math.radians(pointA[0])
-    lat2 = math.radians(pointB[0])
-
-    diffLong = math.radians(pointB[1] - pointA[1])
+    diffLong = math.radians(lon2 - lon1)
+    lat1 = math.radians(lat1)
+    lat2 = math.radians(lat2)
 
     x = math.sin(diffLong) * math.cos(lat2)
     y = math.cos(lat1) * math.sin(lat2) - (math.sin(lat1)
@@ -70,112 +79,326 @@ def calculate_initial_compass_bearing(pointA, pointB):
     # from -180° to + 180° which is not what we want for a compass bearing
     # The solution is to normalize the initial bearing as shown below
     initial_bearing = math.degrees(initial_bearing)
-    compass_bearing = (initial_bearing + 360) % 360
+    bearing = (initial_bearing + 360) % 360
+
+    return bearing
 
-    return compass_bearing
+
+
+def calculate_initial_compass_bearing(pointA, pointB):
+    """
+    Calculates the bearing between two points.
+    Tuple interface to compass_bearing.
+
+    :Parameters:
+      - `pointA: The tuple representing the latitude/longitude for the
+        first point. Latitude and longitude must be in decimal degrees
+      - `pointB: The tuple representing the latitude/longitude for the
+        second point. Latitude and longitude must be in decimal degrees
+
+    :Returns:
+      The bearing in degrees
+
+    :Returns Type:
+      float
+    """
+    if (type(pointA) != tuple) or (type(pointB) != tuple):
+        raise TypeError("Only tuples are supported as arguments")
+
+    return compass_bearing(pointA[0], pointA[1], pointB[0], pointB[1])
     
 
 
-def calculate_segment_angles(polySimple, maxAngleChange = 45):
+@njit(cache=True)
+def bearing_atan2(diffX, diffY):
+    """
+    Calculates bearings of vectors using a polynomial approximation of atan2
+    (max error ~2e-6 rad) that avoids calls to the math library.
+
+    :Parameters:
+      - `diffX: array of vector east components.
+      - `diffY: array of vector north components.
+
+    :Returns:
+      - bearing in radians <0, 2pi)
+
+    :Returns Type:
+      numpy array
+    """
+    absX = np.abs(diffX)
+    absY = np.abs(diffY)
+    maxXY = np.maximum(absX, absY)
+
+    # atan of ratio in <0, 1> from its odd polynomial approximation
+    t = np.minimum(absX, absY) / np.where(maxXY == 0, 1.0, maxXY)
+    t2 = t * t
+    angle = t * (0.99997726 + t2 * (-0.33262347 + t2 * (0.19354346 + t2 * (-0.11643287
+                 + t2 * (0.05265332 + t2 * -0.01172120)))))
+
+    # Fix octant and quadrant, bearing is measured clockwise from north
+    angle = np.where(absX > absY, math.pi / 2 - angle, angle)
+    angle = np.where(diffY < 0, math.pi - angle, angle)
+    angle = np.where(diffX < 0, 2 * math.pi - angle, angle)
+
+    return angle % (2 * math.pi)
+
+
+
+@njit(cache=True)
+def calculate_segment_angles(simpleX, simpleY, maxAngleChange = 45):
     """
     Calculates angles of all polygon segments to cardinal directions.
 
     :Parameters:
-      - `polySimple: shapely polygon object containing simplified building.
+      - `simpleX: array of longitudes of simplified building ring points.
+      - `simpleY: array of latitudes of simplified building ring points.
       - `maxAngleChange: angle (0,45> degrees. Sets the maximum angle deviation
                          from the cardinal direction for the segment to be still 
                          considered to continue in the same direction as the 
-                         previous segment.
+                         previous segment. Segments deviating more turn to the 
+                         adjacent direction, or to the opposite direction when 
+                         deviating more than 135 degrees.
 
     :Returns:
-      - orgAngle: Segments bearing
-      - corAngle: Segments angles to closest cardinal direction
+      - orgAngle: Segments bearing in radians
+      - corAngle: Segments angles to closest cardinal direction in radians
       - dirAngle: Segments direction [N, E, S, W] as [0, 1, 2, 3]
 
     :Returns Type:
-      list
+      numpy array
     """
-    # Convert limit angle to angle for subtraction
-    maxAngleChange = 45 - maxAngleChange
-
-    # Get points Lat/Lon
-    simpleX = polySimple.exterior.xy[0]
-    simpleY = polySimple.exterior.xy[1]
-
-    # Calculate angle to cardinal directions for each segment of polygon
-    orgAngle = [] # Original angles
-    corAngle = [] # Correction angles used for rotation
-    dirAngle = [] # 0,1,2,3 = N,E,S,W
-    limit = [0] * 4
-
-    for i in range(0, (len(simpleX) - 1)):
-        point1 = (simpleY[i], simpleX[i])
-        point2 = (simpleY[i+1], simpleX[i+1])
-        angle = calculate_initial_compass_bearing(point1, point2)
-
-        if angle > (45 + limit[1]) and angle <= (135 - limit[1]):
-            orgAngle.append(angle)
-            corAngle.append(angle - 90)
-            dirAngle.append(1)
-
-        elif angle > (135 + limit[2]) and angle <= (225 - limit[2]):
-            orgAngle.append(angle)
-            corAngle.append(angle - 180)
-            dirAngle.append(2)
-
-        elif angle > (225 + limit[3]) and angle <= (315 - limit[3]):
-            orgAngle.append(angle)
-            corAngle.append(angle - 270)
-            dirAngle.append(3)
-
-        elif angle > (315 + limit[0]) and angle <= 360:
-            orgAngle.append(angle)
-            corAngle.append(angle - 360)
-            dirAngle.append(0)
-
-        elif angle >= 0 and angle <= (45 - limit[0]):
-            orgAngle.append(angle)
-            corAngle.append(angle)
-            dirAngle.append(0)
-
-
-        limit = [0] * 4
-        limit[ dirAngle[i] ] = maxAngleChange               # Set angle limit for the current direction
-        limit[ (dirAngle[i] + 1) % 4 ] = -maxAngleChange    # Extend the angles for the adjacent directions
-        limit[ (dirAngle[i] - 1) % 4 ] = -maxAngleChange
+    # Calculate bearing of all polygon segments at once. At building scale the
+    # segments are short enough to be treated as straight lines in a local plane
+    diffX = (simpleX[1:] - simpleX[:-1]) * np.cos(np.radians((simpleY[:-1] + simpleY[1:]) / 2))
+    diffY = simpleY[1:] - simpleY[:-1]
+
+    orgAngle = bearing_atan2(diffX, diffY)   # Original angles
+    corAngle, dirAngle = calculate_segment_directions(orgAngle, maxAngleChange)
 
     return orgAngle, corAngle, dirAngle
 
 
 
-def rotate_polygon(polySimple, angle):
+@njit(cache=True)
+def calculate_segment_directions(orgAngle, maxAngleChange = 45):
     """
-    Rotates polygon around its centroid for given angle.
+    Calculates angles of segments with given bearings to cardinal directions.
 
     :Parameters:
-      - `polySimple: shapely polygon object containing simplified building.
-      - `angle: angle of rotation in decimal degrees.  
-                Positive = counter-clockwise, Negative = clockwise 
+      - `orgAngle: array of segments bearings in radians.
+      - `maxAngleChange: angle (0,45> degrees, see calculate_segment_angles.
 
     :Returns:
-      - bSR: rotated polygon
+      - corAngle: Segments angles to closest cardinal direction in radians
+      - dirAngle: Segments direction [N, E, S, W] as [0, 1, 2, 3]
 
     :Returns Type:
-      shapely Polygon
+      numpy array
     """
-    # Create WGS84 referenced GeoSeries
-    bS = gpd.GeoDataFrame({'geometry':[polySimple]})
-    bS.crs = "EPSG:4326"
+    # Calculate angle to cardinal directions for each segment of polygon (all angles in radians)
+    quarter = math.pi / 2
+    dirAngle = np.ceil((orgAngle - quarter / 2) / quarter).astype(np.int64) % 4    # 0,1,2,3 = N,E,S,W
+
+    # Segments deviating from the direction of the previous segment by more than maxAngleChange
+    # turn to the adjacent direction, or to the opposite direction when deviating more than 135˚
+    if maxAngleChange < 45:
+        limit = math.radians(maxAngleChange)
+        for i in range(1, len(orgAngle)):
+            deviation = (orgAngle[i] - dirAngle[i-1] * quarter + math.pi) % (2 * math.pi) - math.pi
+            turn = int(abs(deviation) > limit) + int(abs(deviation) > 1.5 * quarter)
+            dirAngle[i] = (dirAngle[i-1] + int(math.copysign(turn, deviation))) % 4
 
-    # Temporary reproject to Merkator and rotate by median angle
-    bSR = bS.to_crs('epsg:3857')
-    bSR = bSR.rotate(angle, origin='centroid', use_radians=False) 
-    bSR = bSR.to_crs('epsg:4326')
+    corAngle = orgAngle - dirAngle * quarter    # Correction angles used for rotation
+    corAngle -= 2 * math.pi * (corAngle > math.pi)
 
-    # Extract only shapely polygon object
-    bSR = bSR[0]
+    return corAngle, dirAngle
+
+
+
+@njit(cache=True)
+def ring_centroid(simpleX, simpleY):
+    """
+    Calculates centroid of area enclosed by polygon ring.
+
+    :Parameters:
+      - `simpleX: array of longitudes of closed ring points.
+      - `simpleY: array of latitudes of closed ring points.
+
+    :Returns:
+      - (lon, lat) of centroid
+
+    :Returns Type:
+      tuple
+    """
+    # Work relative to first point to keep precision
+    x = simpleX - simpleX[0]
+    y = simpleY - simpleY[0]
+    cross = x[:-1] * y[1:] - x[1:] * y[:-1]
+    area = cross.sum()
+
+    if area == 0:   # Degenerate ring, fall back to mean of points
+        return simpleX[:-1].mean(), simpleY[:-1].mean()
+
+    cx = ((x[:-1] + x[1:]) * cross).sum() / (3 * area)
+    cy = ((y[:-1] + y[1:]) * cross).sum() / (3 * area)
+
+    return simpleX[0] + cx, simpleY[0] + cy
+
+
+
+@njit(cache=True)
+def rotate_polygon(xy, cosAngle, sinAngle, origin):
+    """
+    Rotates polygon points in place around origin for angle given by its cosine and sine.
+
+    Points are rotated in a local tangent plane where longitudes are scaled
+    by cos(latitude) of the origin, which keeps angles undistorted at the
+    scale of a building without reprojecting the polygon.
+
+    :Parameters:
+      - `xy: (N, 2) array of point longitudes and latitudes, updated in place.
+      - `cosAngle: cosine of angle of rotation.
+      - `sinAngle: sine of angle of rotation. Angle is positive = counter-clockwise,
+                   negative = clockwise, so inverse rotation only flips its sign.
+      - `origin: (lon, lat) tuple of the point to rotate around.
+    """
+    cx, cy = origin
+    k = math.cos(math.radians(cy))
+
+    # Move to local plane centered at origin
+    dx = (xy[:, 0] - cx) * k
+    dy = xy[:, 1] - cy
+
+    # Rotate and move back
+    xy[:, 0] = cx + (cosAngle * dx - sinAngle * dy) / k
+    xy[:, 1] = cy + sinAngle * dx + cosAngle * dy
+
+
+
+@njit(cache=True)
+def orthogonalize_ring(xy, maxAngleChange, skewTolerance):
+    """
+    Makes all angles of a single closed polygon ring either 90 or 180 degrees.
+    See orthogonalize_polygon for description of the steps and parameters.
+
+    :Parameters:
+      - `xy: (N, 2) array of longitudes and latitudes of closed ring points,
+             updated in place.
+    """
+    # Get angles from cardinal directions of all segments
+    orgAngle, corAngle, dirAngle = calculate_segment_angles(xy[:, 0], xy[:, 1])
+
+    # Calculate median angle that will be used for rotation
+    stdAngle = math.sqrt(((corAngle - corAngle.mean()) ** 2).sum() / (len(corAngle) - 1))
+    if stdAngle < math.radians(30):
+        medAngle = np.median(corAngle)
+    else:
+        medAngle = math.pi / 4  # Account for cases when building is at ~45˚ and we can't decide if to turn clockwise or anti-clockwise
+
+    # Rotate polygon to align its edges to cardinal directions
+    origin = ring_centroid(xy[:, 0], xy[:, 1])
+    cosAngle = math.cos(medAngle)
+    sinAngle = math.sin(medAngle)
+    rotate_polygon(xy, cosAngle, sinAngle, origin)
+
+    # Get directions of rotated polygon segments, rotating counter-clockwise decreases their bearings
+    orgAngle = (orgAngle - medAngle) % (2 * math.pi)
+    corAngle, dirAngle = calculate_segment_directions(orgAngle, maxAngleChange)
+
+    # Fix 180 degree turns (N->S, S->N, E->W, W->E)
+    # Subtract two adjacent directions and if the difference is 2, which means we have 180˚ turn (0,1,3 are OK) then use the direction of the previous segment
+    turn180 = np.abs(dirAngle - np.roll(dirAngle, -1)) == 2
+    dirAngle = np.where(turn180, np.roll(dirAngle, 1), dirAngle)
+
+    # Preserving skewed walls: Leave walls that are obviously meant to be skewed 45˚+/- tolerance˚ (e.g.angle 30-60 degrees) off main walls as untouched
+    straight = np.abs(orgAngle % (math.pi / 2) - math.pi / 4) >= math.radians(skewTolerance)
+
+    # Group adjacent straight segments following the same direction into one large straight line
+    # Ring is closed so the last segment is followed by the first one
+    sameDirNext = straight & np.roll(straight, -1) & (dirAngle == np.roll(dirAngle, -1))
+    first = straight & ~np.roll(sameDirNext, 1)
+    last = straight & ~sameDirNext
+    starts = np.flatnonzero(first)
+
+    if len(starts) > 0:
+        group = np.cumsum(first) - 1
+        group[group < 0] = len(starts) - 1   # Line at the start of ring continues from the end of ring
+
+        segments = np.flatnonzero(straight)
+        segGroup = group[segments]
+        ends = np.flatnonzero(last)
+        endGroup = group[ends]
+        endPoints = (ends + 1) % len(straight)
+
+        # Adjust points coodinates by taking the average of points in line (segment has 2 points therefore +1)
+        # for N,S lines average x coordinate, for E,W lines average y coordinate
+        vertical = dirAngle[starts] % 2 == 0
+        segVertical = vertical[segGroup]
+        endVertical = vertical[endGroup]
+
+        rotatedX = xy[:, 0]
+        rotatedY = xy[:, 1]
+        sums = np.bincount(segGroup, np.where(segVertical, rotatedX[segments], rotatedY[segments]), len(starts))
+        sums += np.bincount(endGroup, np.where(endVertical, rotatedX[endPoints], rotatedY[endPoints]), len(starts))
+        means = sums / (np.bincount(segGroup, minlength=len(starts)) + 1)
+
+        # Update with new coordinates, last point of ring is the same as first one
+        rotatedX[endPoints[endVertical]] = means[endGroup[endVertical]]
+        rotatedY[endPoints[~endVertical]] = means[endGroup[~endVertical]]
+        rotatedX[segments[segVertical]] = means[segGroup[segVertical]]
+        rotatedY[segments[~segVertical]] = means[segGroup[~segVertical]]
+        rotatedX[-1] = rotatedX[0]
+        rotatedY[-1] = rotatedY[0]
+
+    # Rotate points back around the same origin
+    rotate_polygon(xy, cosAngle, -sinAngle, origin)
+
+
+
+@njit(parallel=True, cache=True)
+def orthogonalize_rings(coords, offsets, maxAngleChange, skewTolerance):
+    """
+    Orthogonalizes many closed rings stored one after another in a flat coordinate
+    buffer. Rings are independent of each other and are processed in parallel.
+
+    :Parameters:
+      - `coords: (N, 2) array of longitudes and latitudes of all ring points,
+                 updated in place.
+      - `offsets: array of ring start indices, followed by total number of points.
+    """
+    for r in prange(len(offsets) - 1):
+        orthogonalize_ring(coords[offsets[r]:offsets[r + 1]], maxAngleChange, skewTolerance)
+
+
+
+def orthogonalize_polygons(polygons, maxAngleChange = 15, skewTolerance = 15):
+    """
+    Orthogonalizes an array of polygons at once, see orthogonalize_polygon.
+
+    :Parameters:
+      - `polygons: array of shapely polygon objects containing simplified buildings.
+
+    :Returns:
+      - orthogonalized shapely polygons
+
+    :Returns Type:
+      numpy array
+    """
+    # Flatten outer and inner rings of all polygons into one coordinate buffer
+    rings, ringIndex = shapely.get_rings(polygons, return_index=True)
+    if len(rings) == 0:   # Only empty polygons, nothing to orthogonalize
+        return np.array(polygons, dtype=object)
+
+    coords, coordIndex = shapely.get_coordinates(rings, return_index=True)
+    offsets = np.searchsorted(coordIndex, np.arange(len(rings) + 1))
+
+    orthogonalize_rings(coords, offsets, maxAngleChange, skewTolerance)
+
+    # Recreate the original objects, first ring of each polygon is its exterior
+    # Empty polygons have no rings and are kept as they are
+    rings = shapely.linearrings(coords, indices=coordIndex)
+    return shapely.polygons(rings, indices=ringIndex, out=np.array(polygons, dtype=object))
 
-    return bSR
 
 
 def orthogonalize_polygon(polygon, maxAngleChange = 15, skewTolerance = 15):
@@ -194,7 +417,9 @@ def orthogonalize_polygon(polygon, maxAngleChange = 15, skewTolerance = 15):
       - `maxAngleChange: angle (0,45> degrees. Sets the maximum angle deviation
                          from the cardinal direction for the segment to be still 
                          considered to continue in the same direction as the 
-                         previous segment.
+                         previous segment. Segments deviating more turn to the 
+                         adjacent direction, or to the opposite direction when 
+                         deviating more than 135 degrees.
       - `skewTolerance: angle <0,45> degrees. Sets skew tolerance for segments that 
                         are at 45˚±Tolerance angle from the overal rectangular shape 
                         of the polygon. Usefull when preserving e.g. bay windows on a 
@@ -206,108 +431,7 @@ def orthogonalize_polygon(polygon, maxAngleChange = 15, skewTolerance = 15):
     :Returns Type:
       shapely Polygon
     """
-    # Check if polygon has inner rings that we want to orthogonalize as well
-    rings = [ Polygon(polygon.exterior) ]
-    for inner in list(polygon.interiors):
-        rings.append(Polygon(inner))
-
-
-    polyOrthog = [] 
-    for polySimple in rings:
-
-        # Get angles from cardinal directions of all segments
-        orgAngle, corAngle, dirAngle = calculate_segment_angles(polySimple)
-
-        # Calculate median angle that will be used for rotation
-        if statistics.stdev(corAngle) < 30:
-            medAngle = statistics.median(corAngle)
-            #avAngle = statistics.mean(corAngle)
-        else:
-            medAngle = 45  # Account for cases when building is at ~45˚ and we can't decide if to turn clockwise or anti-clockwise
-
-        # Rotate polygon to align its edges to cardinal directions
-        polySimpleR = rotate_polygon(polySimple, medAngle)
-
-        # Get directions of rotated polygon segments
-        orgAngle, corAngle, dirAngle = calculate_segment_angles(polySimpleR, maxAngleChange)
-
-        # Get Lat/Lon of rotated polygon points
-        rotatedX = polySimpleR.exterior.xy[0].tolist()
-        rotatedY = polySimpleR.exterior.xy[1].tolist()
-
-        # Scan backwards to check if starting segment is a continuation of straight region in the same direction
-        shift = 0
-        for i in range(1, len(dirAngle)):
-            if dirAngle[0] == dirAngle[-i]:
-                shift = i
-            else:
-                break
-        # If the first segment is part of continuing straight region then reset the index to its beginning
-        if shift != 0:
-            dirAngle  = dirAngle[-shift:] + dirAngle[:-shift]
-            orgAngle  = orgAngle[-shift:] + orgAngle[:-shift]
-            rotatedX = rotatedX[-shift-1:-1] + rotatedX[:-shift]    # First and last points are the same in closed polygons
-            rotatedY = rotatedY[-shift-1:-1] + rotatedY[:-shift]
-
-        # Fix 180 degree turns (N->S, S->N, E->W, W->E)
-        # Subtract two adjacent directions and if the difference is 2, which means we have 180˚ turn (0,1,3 are OK) then use the direction of the previous segment
-        dirAngleRoll = dirAngle[1:] + dirAngle[0:1]
-        dirAngle = [ dirAngle[i-1] if abs(dirAngle[i]-dirAngleRoll[i])==2 else dirAngle[i] for i in range(len(dirAngle)) ]
-
-        # Cycle through all segments
-        # Adjust points coodinates by taking the average of points in segment
-        dirAngle.append(dirAngle[0]) # Append dummy value
-        orgAngle.append(orgAngle[0]) # Append dummy value
-        segmentBuffer = [] # Buffer for determining which segments are part of one large straight line 
-
-        for i in range(0, len(dirAngle) - 1):
-            # Preserving skewed walls: Leave walls that are obviously meant to be skewed 45˚+/- tolerance˚ (e.g.angle 30-60 degrees) off main walls as untouched
-            if orgAngle[i] % 90 > (45 - skewTolerance) and orgAngle[i] % 90 < (45 + skewTolerance):
-                continue
-
-            # Dealing with adjacent segments following the same direction
-            segmentBuffer.append(i) 
-            if dirAngle[i] == dirAngle[i + 1]: # If next segment is of same orientation, we need 180 deg angle for straight line. Keep checking.
-                if orgAngle[i + 1] % 90 > (45 - skewTolerance) and orgAngle[i + 1] % 90 < (45 + skewTolerance):
-                    pass
-                else:
-                    continue
-
-            if dirAngle[i] in {0, 2}:   # for N,S segments avereage x coordinate
-                tempX = statistics.mean( rotatedX[ segmentBuffer[0]:segmentBuffer[-1]+2 ] )
-                # Update with new coordinates
-                rotatedX[ segmentBuffer[0]:segmentBuffer[-1]+2 ] = [tempX] * (len(segmentBuffer) + 1)  # Segment has 2 points therefore +1
-            elif dirAngle[i] in {1, 3}:  # for E,W segments avereage y coordinate 
-                tempY = statistics.mean( rotatedY[ segmentBuffer[0]:segmentBuffer[-1]+2 ] )
-                # Update with new coordinates
-                rotatedY[ segmentBuffer[0]:segmentBuffer[-1]+2 ] = [tempY] * (len(segmentBuffer) + 1)
-            
-            if 0 in segmentBuffer:  # Copy change in first point to its last point so we don't lose it during Reverse shift
-                rotatedX[-1] = rotatedX[0]
-                rotatedY[-1] = rotatedY[0]
-            
-            segmentBuffer = []
-        
-
-        # Reverse shift so we get polygon with the same start/end point as before
-        if shift != 0:
-            rotatedX = rotatedX[shift:] + rotatedX[1:shift+1]    # First and last points are the same in closed polygons
-            rotatedY = rotatedY[shift:] + rotatedY[1:shift+1]
-        else:
-            rotatedX[0] = rotatedX[-1]    # Copy updated coordinates to first node
-            rotatedY[0] = rotatedY[-1]
-
-        # Create polygon from new points
-        polyNew = Polygon(zip(rotatedX, rotatedY))
-        
-        # Rotate polygon back
-        polyNew = rotate_polygon(polyNew, -medAngle)
-        
-        # Add to list of finihed rings
-        polyOrthog.append(polyNew)
-
-    # Recreate the original object
-    polyOrthog = Polygon(polyOrthog[0].exterior, [inner.exterior for inner in polyOrthog[1:]])
+    polyOrthog = orthogonalize_polygons([polygon], maxAngleChange, skewTolerance)[0]
     return polyOrthog
 
 
@@ -318,25 +442,22 @@ def orthogonalize_polygon(polygon, maxAngleChange = 15, skewTolerance = 15):
 buildings = gpd.read_file('inFile.geojson')
 buildings.crs = "EPSG:4326"
 
-for i in range(0, len(buildings)):
-    build = buildings.loc[i, 'geometry']
+# Split Multipolygons into individual polygons, index refers to the original building
+geometry = np.asarray(buildings.geometry.values)
+polygons, index = shapely.get_parts(geometry, return_index=True)
 
-    if build.type == 'MultiPolygon': # Multipolygons
-        multipolygon = []
+# Empty Multipolygons have no parts and are kept as they are
+buildOrtho = geometry.copy()
 
-        for poly in build:
-            buildOrtho = orthogonalize_polygon(poly)
-            multipolygon.append(buildOrtho)
+if len(polygons) > 0:
+    polygons = orthogonalize_polygons(polygons)
 
-        buildings.loc[i, 'geometry'] = gpd.GeoSeries(MultiPolygon(multipolygon)).values # Workaround for Pandas/Geopandas bug
-        # buildings.loc[i, 'geometry'] = MultiPolygon(multipolygon)   # Does not work
-    
-    else:    # Polygons
-        
-        buildOrtho = orthogonalize_polygon(build)
-              
-        buildings.loc[i, 'geometry'] = buildOrtho
+    # Reassemble Multipolygons and keep Polygons as they were
+    multipolygons = shapely.multipolygons(polygons, indices=index, out=geometry.copy())
+    isMulti = shapely.get_type_id(geometry) == shapely.GeometryType.MULTIPOLYGON
+    buildOrtho = np.where(isMulti, multipolygons, shapely.get_geometry(multipolygons, 0))
 
+buildings.geometry = gpd.GeoSeries(buildOrtho, index=buildings.index, crs=buildings.crs)
 
-buildings.to_file('outFile.geojson', driver='GeoJSON')
 
+buildings.to_file('outFile.geojson', driver='GeoJSON')
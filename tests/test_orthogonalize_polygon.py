@@ -0,0 +1,60 @@
+import json
+import os
+import runpy
+
+import geopandas as gpd
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(__file__), os.pardir, 'orthogonalize_polygon.py')
+
+BUILDING = [[[-73.9300, 40.7300], [-73.9298, 40.73001], [-73.92981, 40.7301], [-73.93001, 40.73009], [-73.9300, 40.7300]]]
+
+
+def run_script(tmp_path, monkeypatch, geometries):
+    features = [{'type': 'Feature', 'properties': {'id': i}, 'geometry': geom} for i, geom in enumerate(geometries)]
+    (tmp_path / 'inFile.geojson').write_text(json.dumps({'type': 'FeatureCollection', 'features': features}))
+
+    monkeypatch.chdir(tmp_path)
+    runpy.run_path(SCRIPT)
+
+    return gpd.read_file(tmp_path / 'outFile.geojson')
+
+
+@pytest.mark.parametrize('position', [0, 1, 2])
+def test_empty_multipolygon_is_kept(tmp_path, monkeypatch, position):
+    geometries = [{'type': 'Polygon', 'coordinates': BUILDING},
+                  {'type': 'MultiPolygon', 'coordinates': [BUILDING]}]
+    geometries.insert(position, {'type': 'MultiPolygon', 'coordinates': []})
+
+    buildings = run_script(tmp_path, monkeypatch, geometries)
+
+    assert len(buildings) == 3
+    assert list(buildings['id']) == [0, 1, 2]
+    empty = buildings.geometry[position]
+    assert empty is None or empty.is_empty
+    others = buildings.drop(index=position)
+    assert list(others.geom_type) == ['Polygon', 'MultiPolygon']
+    assert not others.geometry.is_empty.any()
+
+
+@pytest.mark.parametrize('geometries', [
+    [{'type': 'MultiPolygon', 'coordinates': []}],
+    [{'type': 'MultiPolygon', 'coordinates': []}, {'type': 'MultiPolygon', 'coordinates': []}],
+    [{'type': 'Polygon', 'coordinates': []}],
+])
+def test_only_empty_buildings_are_kept(tmp_path, monkeypatch, geometries):
+    buildings = run_script(tmp_path, monkeypatch, geometries)
+
+    assert len(buildings) == len(geometries)
+    assert all(geom is None or geom.is_empty for geom in buildings.geometry)
+
+
+def test_polygon_is_orthogonalized(tmp_path, monkeypatch):
+    buildings = run_script(tmp_path, monkeypatch, [{'type': 'Polygon', 'coordinates': BUILDING}])
+
+    coords = list(buildings.geometry[0].exterior.coords)
+    assert len(coords) == 5
+    # Opposite sides of an orthogonalized quadrilateral are parallel and of equal length
+    a = [coords[1][i] - coords[0][i] for i in range(2)]
+    b = [coords[2][i] - coords[3][i] for i in range(2)]
+    assert a == pytest.approx(b, abs=1e-9)